@@ -2,18 +2,25 @@
 批量分析所有主流市场比值
 一次性生成所有比值的图表和数据
 """
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 
 # 添加当前目录到路径
 current_dir = Path(__file__).parent
 sys.path.insert(0, str(current_dir))
 
-from mt5_client.client import MT5Client, MT5Credentials
-from mt5_client.periods import timeframe_from_str
+from mt5_client.client import MAX_FETCH_WORKERS, MT5Client, MT5Credentials
+from mt5_client.periods import Timeframe, timeframe_info
+from mt5_client.ratios import CHART_DPI, HAS_PARQUET, calculate_stats, save_ratio_data
+import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # 只保存PNG，不需要交互式窗口后端
 import matplotlib.pyplot as plt
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import matplotlib.dates as mdates
 
 # 设置中文字体
@@ -69,62 +76,86 @@ RATIO_CONFIGS = [
     },
 ]
 
-def get_historical_data(client: MT5Client, symbol: str, timeframe: int, days: int):
-    """使用MT5Client获取历史数据"""
-    end_time = datetime.now()
-    start_time = end_time - timedelta(days=days)
-    
-    df = client.get_rates(
-        symbol=symbol,
-        timeframe=timeframe,
-        from_time_utc=start_time,
-        to_time_utc=end_time
-    )
-    
-    return df
+def get_historical_data(client: MT5Client, symbol: str, tf: Timeframe, days: int, end_time: datetime):
+    """使用MT5Client获取历史数据
 
-def calculate_ratio(df1, df2):
-    """计算两个品种的比值"""
-    df1_reset = df1.reset_index()
-    df2_reset = df2.reset_index()
-    
-    merged = pd.merge(df1_reset[['time', 'close']], 
-                      df2_reset[['time', 'close']], 
-                      on='time', 
-                      suffixes=('_1', '_2'))
+    按K线数量从最新一根往前取（copy_rates_from_pos），比按时间范围查询更直接；
+    休市时段没有K线，所以按日历天数估算的数量是上限，取回后再截取最近days天。
+    end_time由调用方统一计算（UTC），保证并行获取的各品种使用相同的时间窗口
+    """
+    count = days * 86400 // tf.seconds
+    df = client.get_rates(symbol=symbol, timeframe=tf.mt5_code, count=count)
     
-    merged['ratio'] = merged['close_1'] / merged['close_2']
+    start_time = end_time - timedelta(days=days)
+    return df.loc[start_time:end_time]
+
+def fetch_symbols(client: MT5Client, symbols, tf: Timeframe, days: int, end_time: datetime):
+    """并行获取多个品种的历史数据，返回 {品种: DataFrame} 缓存
+
+    重复的品种只请求一次，供多个比值共用
+    """
+    unique_symbols = sorted(set(symbols))
+    with ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(unique_symbols))) as executor:
+        futures = {
+            sym: executor.submit(get_historical_data, client, sym, tf, days, end_time)
+            for sym in unique_symbols
+        }
+    return {sym: future.result() for sym, future in futures.items()}
+
+def calculate_ratios(cache, configs):
+    """一次性计算所有比值，返回与configs顺序一致的DataFrame列表
+
+    所有品种的收盘价按时间索引拼成一张宽表，只做一次索引对齐，
+    每个比值只是宽表中两列相除；每个比值仍只保留两个品种都有数据的时间点。
+    比值在float64下计算后转为float32：图表和统计输出都用不到更高精度，
+    后续的统计和绘图只需读取一半的内存
+    """
+    closes = pd.concat({sym: df['close'] for sym, df in cache.items()}, axis=1).sort_index()
     
-    return merged
+    results = []
+    for config in configs:
+        pair = closes[[config['symbol1'], config['symbol2']]].dropna()
+        c1 = pair[config['symbol1']].to_numpy()
+        c2 = pair[config['symbol2']].to_numpy()
+        results.append(pd.DataFrame({
+            'time': pair.index,
+            'close_1': c1.astype(np.float32),
+            'close_2': c2.astype(np.float32),
+            'ratio': (c1 / c2).astype(np.float32)
+        }))
+    return results
+
+def plot_single_ratio(ax, data, config, stats):
+    """在给定的坐标轴上绘制单个比值的图表
 
-def plot_single_ratio(data, config):
-    """绘制单个比值的独立图表"""
-    fig, ax = plt.subplots(figsize=(16, 8))
+    坐标轴会先被清空，因此同一个Figure可以在多个比值之间复用
+    """
+    ax.clear()
     
     # 绘制曲线
     ax.plot(data['time'], data['ratio'], linewidth=2, color=config['color'], 
             label=config['name'], alpha=0.9)
     
     # 添加均值线
-    mean_ratio = data['ratio'].mean()
+    mean_ratio = stats.mean
     ax.axhline(y=mean_ratio, color='red', linestyle='--', linewidth=2, 
                label=f'均值: {mean_ratio:.2f}', alpha=0.8)
     
     # 添加标准差区间
-    std_ratio = data['ratio'].std()
+    std_ratio = stats.std
     ax.axhline(y=mean_ratio + std_ratio, color='orange', linestyle=':', linewidth=1.5, alpha=0.7)
     ax.axhline(y=mean_ratio - std_ratio, color='orange', linestyle=':', linewidth=1.5, alpha=0.7)
     ax.fill_between(data['time'], mean_ratio - std_ratio, mean_ratio + std_ratio, 
-                     alpha=0.15, color='orange', label=f'±1标准差: {std_ratio:.2f}')
+                     alpha=0.15, color='orange', label=f'±1标准差: {std_ratio:.2f}',
+                     rasterized=True)
     
     # 添加±2标准差区间
     ax.axhline(y=mean_ratio + 2*std_ratio, color='lightcoral', linestyle=':', linewidth=1, alpha=0.5)
     ax.axhline(y=mean_ratio - 2*std_ratio, color='lightcoral', linestyle=':', linewidth=1, alpha=0.5)
     ax.fill_between(data['time'], mean_ratio - 2*std_ratio, mean_ratio + 2*std_ratio, 
-                     alpha=0.08, color='red')
+                     alpha=0.08, color='red', rasterized=True)
     
     # 设置标题
-    days = (data['time'].iloc[-1] - data['time'].iloc[0]).days
     ax.set_title(f'{config["name"]}走势图 ({config["name1"]}/{config["name2"]})\n{config["description"]}', 
                  fontsize=16, fontweight='bold', pad=20)
     ax.set_xlabel('时间', fontsize=12)
@@ -141,11 +172,11 @@ def plot_single_ratio(data, config):
     # 图例
     ax.legend(loc='best', fontsize=11)
     
-    # 计算当前状态
-    current = data['ratio'].iloc[-1]
-    percentile = (data['ratio'] < current).sum() / len(data) * 100
-    max_val = data['ratio'].max()
-    min_val = data['ratio'].min()
+    # 当前状态
+    current = stats.current
+    percentile = stats.pct
+    max_val = stats.mx
+    min_val = stats.mn
     
     # 状态标注
     if current > mean_ratio + std_ratio:
@@ -163,52 +194,65 @@ def plot_single_ratio(data, config):
     stats_text += f'分位数: {percentile:.1f}%\n'
     stats_text += f'最高值: {max_val:.2f}\n'
     stats_text += f'最低值: {min_val:.2f}\n'
-    stats_text += f'数据点: {len(data)}\n'
-    stats_text += f'时间跨度: {days}天\n'
+    stats_text += f'数据点: {stats.n}\n'
+    stats_text += f'时间跨度: {stats.days}天\n'
     stats_text += f'当前状态: {status}'
     
     ax.text(0.02, 0.98, stats_text, transform=ax.transAxes, 
             fontsize=11, verticalalignment='top',
             bbox=dict(boxstyle='round', facecolor=color, alpha=0.7, edgecolor='black', linewidth=1.5))
     
-    plt.tight_layout()
-    return fig
+    ax.figure.tight_layout()
+    return ax.figure
+
+# 绘图进程内复用的Figure（每个工作进程首次绘图时创建）
+_figure = None
+_axes = None
+
+def render_and_save(result, timestamp):
+    """绘制单个比值的图表并保存为PNG，返回文件名
+
+    作为模块级函数以便在ProcessPoolExecutor的工作进程中调用
+    """
+    global _figure, _axes
+    if _figure is None:
+        _figure, _axes = plt.subplots(figsize=(16, 8))
+    
+    config = result['config']
+    plot_single_ratio(_axes, result['data'], config, result['stats'])
+    
+    filename = f"{config['name']}_{timestamp}.png"
+    _figure.savefig(filename, dpi=CHART_DPI, bbox_inches='tight')
+    return filename
 
 def create_summary_table(all_results):
     """创建汇总表格"""
-    summary_data = []
+    configs = [result['config'] for result in all_results]
+    currents = np.array([result['stats'].current for result in all_results])
+    means = np.array([result['stats'].mean for result in all_results])
+    stds = np.array([result['stats'].std for result in all_results])
+    percentiles = np.array([result['stats'].pct for result in all_results])
     
-    for result in all_results:
-        config = result['config']
-        data = result['data']
-        
-        current = data['ratio'].iloc[-1]
-        mean = data['ratio'].mean()
-        std = data['ratio'].std()
-        percentile = (data['ratio'] < current).sum() / len(data) * 100
-        
-        # 判断状态
-        if current > mean + std:
-            status = "偏高 ⬆️"
-            interpretation = f"{config['name1']}相对强势"
-        elif current < mean - std:
-            status = "偏低 ⬇️"
-            interpretation = f"{config['name2']}相对强势"
-        else:
-            status = "正常 ➡️"
-            interpretation = "均衡状态"
-        
-        summary_data.append({
-            '比值': config['name'],
-            '当前值': f"{current:.2f}",
-            '均值': f"{mean:.2f}",
-            '标准差': f"{std:.2f}",
-            '分位数': f"{percentile:.0f}%",
-            '状态': status,
-            '解读': interpretation
-        })
+    # 判断状态（一次性对所有比值分类）
+    is_high = currents > means + stds
+    is_low = currents < means - stds
+    status = np.select([is_high, is_low], ["偏高 ⬆️", "偏低 ⬇️"], default="正常 ➡️")
+    interpretation = np.select(
+        [is_high, is_low],
+        [[f"{c['name1']}相对强势" for c in configs], [f"{c['name2']}相对强势" for c in configs]],
+        default="均衡状态"
+    )
     
-    return pd.DataFrame(summary_data)
+    # 按列构建表格
+    return pd.DataFrame({
+        '比值': [config['name'] for config in configs],
+        '当前值': pd.Series(currents).map('{:.2f}'.format),
+        '均值': pd.Series(means).map('{:.2f}'.format),
+        '标准差': pd.Series(stds).map('{:.2f}'.format),
+        '分位数': pd.Series(percentiles).map('{:.0f}%'.format),
+        '状态': status,
+        '解读': interpretation
+    })
 
 def main():
     """主函数"""
@@ -226,7 +270,7 @@ def main():
     print()
     
     try:
-        timeframe = timeframe_from_str(timeframe_str)
+        tf = timeframe_info(timeframe_str)
         
         print("🔌 正在连接MT5...")
         with MT5Client(MT5Credentials()) as client:
@@ -234,53 +278,57 @@ def main():
             
             all_results = []
             
-            # 逐个分析
+            # 预先获取所有比值用到的品种（重复品种如XAUUSD只请求一次）
+            end_time = datetime.now(timezone.utc)
+            needed = {cfg['symbol1'] for cfg in RATIO_CONFIGS} | {cfg['symbol2'] for cfg in RATIO_CONFIGS}
+            print(f"📥 并行获取{len(needed)}个品种数据...")
+            cache = fetch_symbols(client, needed, tf, days, end_time)
+            
+            # 在对齐后的宽表上批量计算所有比值
+            ratios = calculate_ratios(cache, RATIO_CONFIGS)
+            
+            # 逐个分析（每个比值的输出先拼成一段文本，再一次性写到控制台）
             for i, config in enumerate(RATIO_CONFIGS, 1):
-                print(f"\n{'='*80}")
-                print(f"[{i}/{len(RATIO_CONFIGS)}] 分析 {config['name']}")
-                print(f"{'='*80}")
-                print(f"说明: {config['description']}")
-                
-                # 获取数据
-                print(f"\n📥 获取{config['name1']}数据 ({config['symbol1']})...", end=" ")
-                df1 = get_historical_data(client, config['symbol1'], timeframe, days)
-                print(f"✅ {len(df1)}条")
-                
-                print(f"📥 获取{config['name2']}数据 ({config['symbol2']})...", end=" ")
-                df2 = get_historical_data(client, config['symbol2'], timeframe, days)
-                print(f"✅ {len(df2)}条")
-                
-                # 计算比值
-                print(f"🔢 计算{config['name']}...", end=" ")
-                ratio_data = calculate_ratio(df1, df2)
-                print(f"✅ {len(ratio_data)}个数据点")
-                
-                # 统计信息
-                current = ratio_data['ratio'].iloc[-1]
-                mean = ratio_data['ratio'].mean()
-                std = ratio_data['ratio'].std()
-                max_val = ratio_data['ratio'].max()
-                min_val = ratio_data['ratio'].min()
-                percentile = (ratio_data['ratio'] < current).sum() / len(ratio_data) * 100
+                df1 = cache[config['symbol1']]
+                df2 = cache[config['symbol2']]
+                ratio_data = ratios[i - 1]
                 
-                print(f"\n📈 统计:")
-                print(f"   当前值: {current:.2f}")
-                print(f"   平均值: {mean:.2f}")
-                print(f"   标准差: {std:.2f}")
-                print(f"   最高值: {max_val:.2f}")
-                print(f"   最低值: {min_val:.2f}")
-                print(f"   分位数: {percentile:.1f}%")
+                # 统计信息（只计算一次，绘图和汇总表复用）
+                stats = calculate_stats(ratio_data)
+                current = stats.current
+                mean = stats.mean
+                std = stats.std
                 
                 if current > mean + std:
-                    print(f"   ⚠️  当前偏高，{config['name1']}相对强势")
+                    verdict = f"   ⚠️  当前偏高，{config['name1']}相对强势"
                 elif current < mean - std:
-                    print(f"   ⚠️  当前偏低，{config['name2']}相对强势")
+                    verdict = f"   ⚠️  当前偏低，{config['name2']}相对强势"
                 else:
-                    print(f"   ✅ 当前在正常范围")
+                    verdict = f"   ✅ 当前在正常范围"
+                
+                lines = [
+                    f"\n{'='*80}",
+                    f"[{i}/{len(RATIO_CONFIGS)}] 分析 {config['name']}",
+                    f"{'='*80}",
+                    f"说明: {config['description']}",
+                    f"\n📥 {config['name1']}数据 ({config['symbol1']}): ✅ {len(df1)}条",
+                    f"📥 {config['name2']}数据 ({config['symbol2']}): ✅ {len(df2)}条",
+                    f"🔢 {config['name']}: ✅ {len(ratio_data)}个数据点",
+                    f"\n📈 统计:",
+                    f"   当前值: {current:.2f}",
+                    f"   平均值: {mean:.2f}",
+                    f"   标准差: {std:.2f}",
+                    f"   最高值: {stats.mx:.2f}",
+                    f"   最低值: {stats.mn:.2f}",
+                    f"   分位数: {stats.pct:.1f}%",
+                    verdict,
+                ]
+                print("\n".join(lines))
                 
                 all_results.append({
                     'config': config,
-                    'data': ratio_data
+                    'data': ratio_data,
+                    'stats': stats
                 })
             
             # 创建独立图表
@@ -290,30 +338,20 @@ def main():
             
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             
-            for result in all_results:
-                config = result['config']
-                data = result['data']
-                
-                print(f"📊 生成{config['name']}图表...", end=" ")
-                
-                # 生成独立图表
-                fig = plot_single_ratio(data, config)
-                
-                # 保存图表
-                filename = f"{config['name']}_{timestamp}.png"
-                plt.savefig(filename, dpi=300, bbox_inches='tight')
-                plt.close(fig)  # 关闭图表，释放内存
-                
-                print(f"✅ {filename}")
+            # 各图表互相独立，用多进程并行绘制和PNG编码
+            workers = min(len(all_results), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                filenames = executor.map(partial(render_and_save, timestamp=timestamp), all_results)
+                for result, filename in zip(all_results, filenames):
+                    print(f"📊 {result['config']['name']}图表: ✅ {filename}")
             
             # 保存各个比值的数据
             print(f"\n💾 保存数据文件...")
             for result in all_results:
                 config = result['config']
                 data = result['data']
-                csv_filename = f"{config['name']}_data_{timestamp}.csv"
-                data.to_csv(csv_filename, index=False, encoding='utf-8-sig')
-                print(f"✅ {csv_filename}")
+                data_filename = save_ratio_data(data, f"{config['name']}_data_{timestamp}")
+                print(f"✅ {data_filename}")
             
             # 创建汇总表格
             print(f"\n{'='*80}")
@@ -331,7 +369,7 @@ def main():
             print("\n✅ 所有分析完成！")
             print(f"\n📁 生成的文件:")
             print(f"   - 5个独立图表 (PNG)")
-            print(f"   - 5个数据文件 (CSV)")
+            print(f"   - 5个数据文件 ({'Parquet' if HAS_PARQUET else 'CSV'})")
             print(f"   - 1个汇总报告 (CSV)")
             
     except Exception as e:
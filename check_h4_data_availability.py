@@ -2,15 +2,17 @@
 检查MT5平台上各品种的4小时数据可用性
 """
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # 添加当前目录到路径
 current_dir = Path(__file__).parent
 sys.path.insert(0, str(current_dir))
 
-from mt5_client.client import MT5Client, MT5Credentials
+from mt5_client.client import MAX_FETCH_WORKERS, MT5Client, MT5Credentials
 from mt5_client.periods import timeframe_from_str
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+import pandas as pd
 import MetaTrader5 as mt5
 
 # 常见的交易品种列表
@@ -53,12 +55,18 @@ SYMBOLS_TO_CHECK = {
     ],
 }
 
-def check_symbol_data(client: MT5Client, symbol: str, timeframe: int, days: int):
-    """检查单个品种的数据可用性"""
+def get_broker_symbols():
+    """一次性获取经纪商提供的全部品种名称"""
+    symbols = mt5.symbols_get()
+    if symbols is None:
+        raise RuntimeError(f"MT5 symbols_get() failed: {mt5.last_error()}")
+    return {s.name for s in symbols}
+
+def check_symbol_data(client: MT5Client, symbol: str, timeframe: int, days: int, broker_symbols: set, end_time: datetime):
+    """检查单个品种的数据可用性（end_time为所有品种共用的UTC结束时间）"""
     try:
-        # 先检查品种是否存在
-        info = mt5.symbol_info(symbol)
-        if info is None:
+        # 先检查品种是否存在（使用预先获取的品种列表，无需逐个请求symbol_info）
+        if symbol not in broker_symbols:
             return {
                 "symbol": symbol,
                 "available": False,
@@ -70,7 +78,6 @@ def check_symbol_data(client: MT5Client, symbol: str, timeframe: int, days: int)
             }
         
         # 尝试获取数据
-        end_time = datetime.now()
         start_time = end_time - timedelta(days=days)
         
         df = client.get_rates(
@@ -117,6 +124,26 @@ def check_symbol_data(client: MT5Client, symbol: str, timeframe: int, days: int)
             "days_span": 0
         }
 
+def summarize_results(all_results):
+    """将各类别的检查结果汇总为一个按类别索引的DataFrame"""
+    df = pd.DataFrame([
+        {"category": category, **result}
+        for category, results in all_results.items()
+        for result in results
+    ])
+    grouped = df.groupby("category", sort=False)
+    available = df[df["available"]].groupby("category", sort=False)
+    unavailable = df[~df["available"]].groupby("category", sort=False)
+    
+    summary = pd.DataFrame({"total": grouped.size()})
+    summary["available"] = available.size().reindex(summary.index, fill_value=0)
+    means = available[["bars", "days_span"]].mean().reindex(summary.index)
+    summary["avg_bars"] = means["bars"]
+    summary["avg_days"] = means["days_span"]
+    summary["available_symbols"] = available["symbol"].agg(", ".join).reindex(summary.index, fill_value="")
+    summary["unavailable_symbols"] = unavailable["symbol"].agg(", ".join).reindex(summary.index, fill_value="")
+    return summary
+
 def main():
     """主函数"""
     print("=" * 80)
@@ -140,6 +167,17 @@ def main():
             
             all_results = {}
             
+            broker_symbols = get_broker_symbols()
+            end_time = datetime.now(timezone.utc)
+            
+            # 所有类别的品种放入同一个线程池并行检查
+            all_symbols = [symbol for symbols in SYMBOLS_TO_CHECK.values() for symbol in symbols]
+            with ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(all_symbols))) as executor:
+                futures = {
+                    symbol: executor.submit(check_symbol_data, client, symbol, timeframe, days, broker_symbols, end_time)
+                    for symbol in all_symbols
+                }
+            
             # 遍历所有类别
             for category, symbols in SYMBOLS_TO_CHECK.items():
                 print(f"\n{'='*80}")
@@ -149,7 +187,7 @@ def main():
                 results = []
                 for symbol in symbols:
                     print(f"检查 {symbol}...", end=" ")
-                    result = check_symbol_data(client, symbol, timeframe, days)
+                    result = futures[symbol].result()
                     results.append(result)
                     
                     if result["available"]:
@@ -164,21 +202,17 @@ def main():
             print("📋 汇总报告")
             print(f"{'='*80}\n")
             
-            for category, results in all_results.items():
-                available = [r for r in results if r["available"]]
-                unavailable = [r for r in results if not r["available"]]
-                
+            summary = summarize_results(all_results)
+            for category, row in summary.iterrows():
                 print(f"\n{category}:")
-                print(f"  ✅ 可用: {len(available)}/{len(results)}")
+                print(f"  ✅ 可用: {row['available']}/{row['total']}")
                 
-                if available:
-                    avg_bars = sum(r["bars"] for r in available) / len(available)
-                    avg_days = sum(r["days_span"] for r in available) / len(available)
-                    print(f"  📊 平均数据量: {avg_bars:.0f}条 ({avg_days:.0f}天)")
-                    print(f"  📈 可用品种: {', '.join(r['symbol'] for r in available)}")
+                if row["available"]:
+                    print(f"  📊 平均数据量: {row['avg_bars']:.0f}条 ({row['avg_days']:.0f}天)")
+                    print(f"  📈 可用品种: {row['available_symbols']}")
                 
-                if unavailable:
-                    print(f"  ❌ 不可用: {', '.join(r['symbol'] for r in unavailable)}")
+                if row["unavailable_symbols"]:
+                    print(f"  ❌ 不可用: {row['unavailable_symbols']}")
             
             # 推荐的比值对
             print(f"\n\n{'='*80}")
@@ -39,21 +39,18 @@ def get_historical_data(client: MT5Client, symbol: str, timeframe: int, days: in
 
 def calculate_gold_silver_ratio(gold_df, silver_df):
     """计算金银比"""
-    # MT5Client返回的DataFrame已经有time作为索引
-    # 重置索引以便合并
-    gold_reset = gold_df.reset_index()
-    silver_reset = silver_df.reset_index()
-    
-    # 合并数据（使用时间对齐）
-    merged = pd.merge(gold_reset[['time', 'close']], 
-                      silver_reset[['time', 'close']], 
-                      on='time', 
+    # MT5Client返回的DataFrame已经有time作为索引，直接按索引合并，
+    # 避免先对两个完整DataFrame各做一次reset_index复制
+    merged = pd.merge(gold_df[['close']], 
+                      silver_df[['close']], 
+                      left_index=True, 
+                      right_index=True, 
                       suffixes=('_gold', '_silver'))
     
     # 计算金银比
     merged['ratio'] = merged['close_gold'] / merged['close_silver']
     
-    return merged
+    return merged.reset_index()
 
 def plot_ratio_chart(data):
     """绘制金银比曲线图"""
@@ -2,122 +2,236 @@
 市场比值分析工具
 支持多种商品/货币对的比值分析
 """
+import atexit
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from types import MappingProxyType
 
-# 添加当前目录到路径
-current_dir = Path(__file__).parent
-sys.path.insert(0, str(current_dir))
+# 作为脚本直接运行时添加当前目录到路径；被其他模块导入时不修改sys.path，避免mt5_client被重复导入
+if __name__ == "__main__" and not __package__:
+    current_dir = Path(__file__).parent
+    sys.path.insert(0, str(current_dir))
 
 from mt5_client.client import MT5Client, MT5Credentials
-from mt5_client.periods import timeframe_from_str
+from mt5_client.periods import Timeframe, timeframe_info
+from mt5_client.cache import load_cached, save_cached, mark_checked, recently_checked
+from mt5_client.ratios import CHART_DPI, calculate_stats, save_ratio_data
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from datetime import datetime, timedelta
-import matplotlib.dates as mdates
+from datetime import datetime, timedelta, timezone
 
-# 设置中文字体
-plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei']
-plt.rcParams['axes.unicode_minus'] = False
+# matplotlib延迟到真正绘图时才导入；设置环境变量MRA_NO_GUI时只保存PNG，不弹出图表窗口
+_mpl_configured = False
 
-# 预设的比值配置 - 主流实用比值
-RATIO_PRESETS = {
-    "金银比": {
-        "symbol1": "XAUUSD",
-        "symbol2": "XAGUSD",
-        "name1": "黄金",
-        "name2": "白银",
-        "description": "经典避险金属比值，历史均值约80，投资者最关注"
-    },
-    "金铂比": {
-        "symbol1": "XAUUSD",
-        "symbol2": "XPTUSD",
-        "name1": "黄金",
-        "name2": "铂金",
-        "description": "贵金属工业需求对比，铂金用于汽车催化剂和珠宝"
-    },
-    "油金比": {
-        "symbol1": "XTIUSD",
-        "symbol2": "XAUUSD",
-        "name1": "原油",
-        "name2": "黄金",
-        "description": "经济活力指标，油价高说明经济强劲，金价高说明避险需求"
-    },
-    "纳指标普比": {
-        "symbol1": "NAS100",
-        "symbol2": "US500",
-        "name1": "纳斯达克",
-        "name2": "标普500",
-        "description": "科技股vs大盘，比值高说明科技股强势"
-    },
-    "道指黄金比": {
-        "symbol1": "US30",
-        "symbol2": "XAUUSD",
-        "name1": "道琼斯",
-        "name2": "黄金",
-        "description": "股市vs避险，比值高说明风险偏好强，低说明避险情绪浓"
-    },
-}
+def _no_gui():
+    """是否禁用图表窗口（环境变量MRA_NO_GUI非空）"""
+    return bool(os.environ.get('MRA_NO_GUI'))
 
-def get_historical_data(client: MT5Client, symbol: str, timeframe: int, days: int):
-    """使用MT5Client获取历史数据"""
-    end_time = datetime.now()
-    start_time = end_time - timedelta(days=days)
+# 按优先级尝试的中文字体，都不可用时回退到matplotlib自带的DejaVu Sans
+CJK_FONTS = ('SimHei', 'Microsoft YaHei', 'Noto Sans CJK SC')
+
+def _pick_font():
+    """返回第一个已安装的中文字体名称（只查询一次字体缓存）"""
+    from matplotlib.font_manager import FontProperties, findfont
+    for family in CJK_FONTS:
+        try:
+            findfont(FontProperties(family=family), fallback_to_default=False)
+        except ValueError:
+            continue
+        return family
+    return 'DejaVu Sans'
+
+def _configure_mpl():
+    """导入并配置matplotlib（只在首次调用时配置），返回pyplot模块"""
+    global _mpl_configured
+    if not _mpl_configured:
+        import logging
+        import warnings
+        import matplotlib
+        if _no_gui():
+            matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        
+        # 设置中文字体；缺少中文字体时matplotlib会记录findfont回退日志，并在绘图时为每个缺失的字符
+        # 发出一条“Glyph ... missing from font(s)”警告，这里统一静音
+        logging.getLogger('matplotlib.font_manager').setLevel(logging.ERROR)
+        warnings.filterwarnings('ignore', message='Glyph .* missing from font')
+        plt.rcParams['font.sans-serif'] = [_pick_font()]
+        plt.rcParams['axes.unicode_minus'] = False
+        # 长曲线绘制时合并视觉上重合的线段，并分块交给AGG渲染
+        plt.rcParams.update({'path.simplify': True,
+                             'path.simplify_threshold': 1.0,
+                             'agg.path.chunksize': 10000})
+        _mpl_configured = True
     
-    df = client.get_rates(
-        symbol=symbol,
-        timeframe=timeframe,
-        from_time_utc=start_time,
-        to_time_utc=end_time
-    )
+    import matplotlib.pyplot as plt
+    return plt
+
+@dataclass(frozen=True)
+class RatioPreset:
+    """预设的比值配置（不可变）"""
+    __slots__ = ('key', 'symbol1', 'symbol2', 'name1', 'name2', 'description')
+    key: str
+    symbol1: str
+    symbol2: str
+    name1: str
+    name2: str
+    description: str
+
+# 预设的比值配置 - 主流实用比值（只读映射：比值名称 -> RatioPreset）
+RATIO_PRESETS = MappingProxyType({p.key: p for p in (
+    RatioPreset("金银比", "XAUUSD", "XAGUSD", "黄金", "白银",
+                "经典避险金属比值，历史均值约80，投资者最关注"),
+    RatioPreset("金铂比", "XAUUSD", "XPTUSD", "黄金", "铂金",
+                "贵金属工业需求对比，铂金用于汽车催化剂和珠宝"),
+    RatioPreset("油金比", "XTIUSD", "XAUUSD", "原油", "黄金",
+                "经济活力指标，油价高说明经济强劲，金价高说明避险需求"),
+    RatioPreset("纳指标普比", "NAS100", "US500", "纳斯达克", "标普500",
+                "科技股vs大盘，比值高说明科技股强势"),
+    RatioPreset("道指黄金比", "US30", "XAUUSD", "道琼斯", "黄金",
+                "股市vs避险，比值高说明风险偏好强，低说明避险情绪浓"),
+)})
+
+def get_historical_data(client: MT5Client, symbol: str, tf: Timeframe,
+                        start_time: datetime, end_time: datetime):
+    """使用MT5Client获取[start_time, end_time]（UTC）内的历史数据
+
+    已收盘的K线不会再变化，因此保存在本地Parquet缓存中，之后只请求缓存之后的新K线；
+    同一进程内在下一个K线边界之前重复请求时使用内存中的K线，不再读取Parquet文件。
+    最后一根K线可能尚未收盘，每次都从它开始重新获取，保证两个品种的最新价格取自同一时刻
+    """
+    timeframe = tf.mt5_code
+    bar = pd.Timedelta(tf.pandas_freq)
+    server = _cache_server(client)
+    
+    loaded = recently_checked(server, symbol, timeframe) or load_cached(server, symbol, timeframe)
+    if loaded is None:
+        df = client.get_rates(symbol=symbol, timeframe=timeframe,
+                              from_time_utc=start_time, to_time_utc=end_time)
+        covered_from = pd.Timestamp(start_time)
+    else:
+        cached, covered_from = loaded
+        parts = []
+        # 请求窗口早于以往请求过的最早时间时，补取前面缺少的部分
+        # （比较的是请求过的时间而不是第一根K线，窗口从周末/假日开始或品种历史较短时不会每次重复补取）
+        if start_time < covered_from:
+            parts.append(client.get_rates(symbol=symbol, timeframe=timeframe,
+                                          from_time_utc=start_time,
+                                          to_time_utc=cached.index[0].to_pydatetime()))
+            covered_from = pd.Timestamp(start_time)
+        parts.append(cached)
+        # 最后一根缓存K线可能尚未收盘，从它开始重新获取
+        parts.append(client.get_rates(symbol=symbol, timeframe=timeframe,
+                                      from_time_utc=cached.index[-1].to_pydatetime(),
+                                      to_time_utc=end_time))
+        df = pd.concat([part for part in parts if len(part)])
+        df = df[~df.index.duplicated(keep='last')].sort_index()
     
-    print(f"✅ {symbol}: 获取 {len(df)} 条数据")
-    return df
+    if len(df):
+        save_cached(server, symbol, timeframe, df, covered_from)
+    mark_checked(server, symbol, timeframe, df, covered_from, bar)
+    return _close_only(df, start_time, end_time)
+
+def _cache_server(client: MT5Client):
+    """当前账户的交易服务器名称（K线缓存按服务器分目录）；取不到账户信息时返回None，不使用缓存"""
+    try:
+        return client.get_account_info().get('server') or None
+    except RuntimeError:
+        return None
 
-def calculate_ratio(df1, df2, name1, name2):
-    """计算两个品种的比值"""
-    # 重置索引以便合并
-    df1_reset = df1.reset_index()
-    df2_reset = df2.reset_index()
+def _close_only(df, start_time, end_time):
+    """比值只用到收盘价：丢弃其余OHLCV列并转为float32，减少后续合并和统计的内存占用"""
+    return df.loc[start_time:end_time, ['close']].astype({'close': 'float32'})
+
+def calculate_ratio(df1, df2, name1, name2, tolerance):
+    """计算两个品种的比值（df1/df2为get_historical_data返回的只含close列的DataFrame）
+
+    两个品种的K线时间完全一致时（最常见的情况），直接在DatetimeIndex交集上做NumPy数组相除；
+    否则用merge_asof在有序时间上就近对齐（容差tolerance，通常为一根K线的长度），
+    保留时间不完全一致（如不同交易所的开盘时间不同）但可匹配的数据点
+    """
+    col1, col2 = f'close_{name1}', f'close_{name2}'
+    df1 = df1.sort_index()
+    df2 = df2.sort_index()
     
-    # 合并数据
-    merged = pd.merge(df1_reset[['time', 'close']], 
-                      df2_reset[['time', 'close']], 
-                      on='time', 
-                      suffixes=(f'_{name1}', f'_{name2}'))
+    idx = df1.index.intersection(df2.index)
+    if len(idx) == len(df1):
+        # df1的每根K线在df2中都有同一时间的K线，就近对齐的结果与精确对齐相同
+        c1 = df1['close'].to_numpy()
+        c2 = df2['close'].reindex(idx).to_numpy()
+        merged = pd.DataFrame({'time': idx, col1: c1, col2: c2})
+    else:
+        # 直接在时间索引上合并（不需要先reset_index复制两份数据），丢弃容差内找不到匹配的K线
+        merged = pd.merge_asof(df1['close'].rename(col1), df2['close'].rename(col2),
+                               left_index=True, right_index=True,
+                               direction='nearest', tolerance=tolerance)
+        merged = merged.dropna(subset=[col2]).reset_index()
     
-    # 计算比值
-    merged['ratio'] = merged[f'close_{name1}'] / merged[f'close_{name2}']
+    # 计算比值（直接在NumPy数组上相除，跳过索引对齐；收盘价为float32，比值按float64计算以保留精度）
+    merged['ratio'] = (merged[col1].to_numpy(dtype=np.float64)
+                       / merged[col2].to_numpy(dtype=np.float64))
     
     return merged
 
-def plot_ratio_chart(data, ratio_name, name1, name2, description):
-    """绘制比值曲线图"""
-    fig, ax = plt.subplots(figsize=(16, 8))
+# 多次绘图时复用的Figure（首次绘图时创建，解释器退出时关闭）
+_figure = None
+_axes = None
+
+def _close_figure():
+    if _figure is not None:
+        _configure_mpl().close(_figure)
+
+def plot_ratio_chart(data, ratio_name, name1, name2, description, stats):
+    """绘制比值曲线图（stats为calculate_stats返回的StatsSummary）
+
+    复用同一个Figure，每次绘图前清空坐标轴；返回的Figure在下次调用时会被覆盖
+    """
+    global _figure, _axes
+    plt = _configure_mpl()
+    import matplotlib.dates as mdates
+    from matplotlib.collections import LineCollection
+    from matplotlib.colors import to_rgba
+    
+    # 交互窗口被关闭后Figure已从pyplot中移除，此时重新创建
+    if _figure is None or not plt.fignum_exists(_figure.number):
+        if _figure is None:
+            atexit.register(_close_figure)
+        _figure, _axes = plt.subplots(figsize=(16, 8))
+    else:
+        _axes.clear()
+    fig, ax = _figure, _axes
     
     # 绘制曲线
-    ax.plot(data['time'], data['ratio'], linewidth=1.5, color='#FFD700', label=f'{ratio_name}')
+    ax.plot(data['time'], data['ratio'], linewidth=1.5, color='#FFD700', label=f'{ratio_name}',
+            rasterized=True)
     
     # 添加均值线
-    mean_ratio = data['ratio'].mean()
+    mean_ratio = stats.mean
     ax.axhline(y=mean_ratio, color='red', linestyle='--', linewidth=1.5, 
                label=f'平均值: {mean_ratio:.2f}')
     
-    # 添加标准差区间
-    std_ratio = data['ratio'].std()
-    ax.axhline(y=mean_ratio + std_ratio, color='orange', linestyle=':', linewidth=1, alpha=0.7)
-    ax.axhline(y=mean_ratio - std_ratio, color='orange', linestyle=':', linewidth=1, alpha=0.7)
-    ax.fill_between(data['time'], mean_ratio - std_ratio, mean_ratio + std_ratio, 
-                     alpha=0.1, color='orange', label=f'±1标准差: {std_ratio:.2f}')
-    
-    # 添加±2标准差区间（浅色）
-    ax.axhline(y=mean_ratio + 2*std_ratio, color='lightcoral', linestyle=':', linewidth=0.8, alpha=0.5)
-    ax.axhline(y=mean_ratio - 2*std_ratio, color='lightcoral', linestyle=':', linewidth=0.8, alpha=0.5)
-    ax.fill_between(data['time'], mean_ratio - 2*std_ratio, mean_ratio + 2*std_ratio, 
-                     alpha=0.05, color='red')
+    # 添加±1/±2标准差区间：水平带用axhspan（单个矩形，无需按数据点展开），
+    # 四条边界线合并为一个LineCollection
+    std_ratio = stats.std
+    ax.axhspan(mean_ratio - std_ratio, mean_ratio + std_ratio,
+               alpha=0.1, color='orange', label=f'±1标准差: {std_ratio:.2f}')
+    ax.axhspan(mean_ratio - 2*std_ratio, mean_ratio + 2*std_ratio, alpha=0.05, color='red')
+    # x方向用坐标轴坐标0~1，与axhline一样铺满整个坐标轴；autolim=False避免x=0~1被当作日期
+    # 参与自动缩放（matplotlib 3.7之前的hlines会这样做）。y范围已由上面的axhspan覆盖
+    band_lines = LineCollection(
+        [[(0, y), (1, y)] for y in (mean_ratio - 2*std_ratio, mean_ratio - std_ratio,
+                                    mean_ratio + std_ratio, mean_ratio + 2*std_ratio)],
+        transform=ax.get_yaxis_transform(),
+        colors=[to_rgba('lightcoral', 0.5), to_rgba('orange', 0.7),
+                to_rgba('orange', 0.7), to_rgba('lightcoral', 0.5)],
+        linewidths=[0.8, 1, 1, 0.8], linestyles=':')
+    ax.add_collection(band_lines, autolim=False)
     
     # 设置标题和标签
-    days = (data['time'].iloc[-1] - data['time'].iloc[0]).days
+    days = stats.days
     ax.set_title(f'{ratio_name}走势图 ({name1}/{name2})\n{description}', 
                  fontsize=16, fontweight='bold', pad=20)
     ax.set_xlabel('时间', fontsize=12)
@@ -131,7 +245,7 @@ def plot_ratio_chart(data, ratio_name, name1, name2, description):
         ax.xaxis.set_major_locator(mdates.MonthLocator(interval=2))
     else:
         ax.xaxis.set_major_locator(mdates.MonthLocator(interval=1))
-    plt.xticks(rotation=45)
+    ax.tick_params(axis='x', labelrotation=45)
     
     # 添加网格
     ax.grid(True, alpha=0.3, linestyle='--')
@@ -140,15 +254,15 @@ def plot_ratio_chart(data, ratio_name, name1, name2, description):
     ax.legend(loc='best', fontsize=10)
     
     # 计算当前相对位置
-    current_ratio = data['ratio'].iloc[-1]
-    percentile = (data['ratio'] < current_ratio).sum() / len(data) * 100
+    current_ratio = stats.current
+    percentile = stats.pct
     
     # 添加统计信息
     stats_text = f'最新值: {current_ratio:.2f}\n'
     stats_text += f'分位数: {percentile:.1f}%\n'
-    stats_text += f'最高值: {data["ratio"].max():.2f}\n'
-    stats_text += f'最低值: {data["ratio"].min():.2f}\n'
-    stats_text += f'数据点: {len(data)}\n'
+    stats_text += f'最高值: {stats.mx:.2f}\n'
+    stats_text += f'最低值: {stats.mn:.2f}\n'
+    stats_text += f'数据点: {stats.n}\n'
     stats_text += f'时间跨度: {days}天'
     
     # 判断当前位置
@@ -168,11 +282,11 @@ def plot_ratio_chart(data, ratio_name, name1, name2, description):
             fontsize=10, verticalalignment='top',
             bbox=dict(boxstyle='round', facecolor=color, alpha=0.6))
     
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
 
-def analyze_ratio(ratio_key, timeframe_str="H4", days=1825):
-    """分析指定的比值"""
+def analyze_ratio(ratio_key, timeframe_str="H4", days=1825, export_format='parquet'):
+    """分析指定的比值（export_format: 'parquet'或'csv'）"""
     if ratio_key not in RATIO_PRESETS:
         print(f"❌ 未找到预设: {ratio_key}")
         print(f"可用预设: {', '.join(RATIO_PRESETS.keys())}")
@@ -185,75 +299,84 @@ def analyze_ratio(ratio_key, timeframe_str="H4", days=1825):
     print("=" * 70)
     
     print(f"\n📊 分析配置:")
-    print(f"   品种1: {config['symbol1']} ({config['name1']})")
-    print(f"   品种2: {config['symbol2']} ({config['name2']})")
+    print(f"   品种1: {config.symbol1} ({config.name1})")
+    print(f"   品种2: {config.symbol2} ({config.name2})")
     print(f"   时间周期: {timeframe_str}")
     print(f"   数据范围: 最近{days}天")
-    print(f"   说明: {config['description']}")
+    print(f"   说明: {config.description}")
     print()
     
     try:
-        timeframe = timeframe_from_str(timeframe_str)
+        tf = timeframe_info(timeframe_str)
+        # 两个品种使用同一个UTC时间窗口，保证K线时间一致
+        end_time = datetime.now(timezone.utc)
+        start_time = end_time - timedelta(days=days)
         
         print("🔌 正在连接MT5...")
         with MT5Client(MT5Credentials()) as client:
             print("✅ MT5连接成功\n")
             
-            # 获取数据
-            print(f"📥 正在获取{config['name1']}数据...")
-            df1 = get_historical_data(client, config['symbol1'], timeframe, days)
-            
-            print(f"📥 正在获取{config['name2']}数据...")
-            df2 = get_historical_data(client, config['symbol2'], timeframe, days)
+            # 获取数据（两个品种的MT5请求主要在等待I/O，并行发出以重叠等待时间）
+            print(f"📥 正在获取{config.name1}和{config.name2}数据...")
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                f1 = executor.submit(get_historical_data, client, config.symbol1,
+                                     tf, start_time, end_time)
+                f2 = executor.submit(get_historical_data, client, config.symbol2,
+                                     tf, start_time, end_time)
+                df1, df2 = f1.result(), f2.result()
+            print(f"✅ {config.symbol1}: 获取 {len(df1)} 条数据")
+            print(f"✅ {config.symbol2}: 获取 {len(df2)} 条数据")
             
             # 计算比值
             print(f"\n🔢 正在计算{ratio_key}...")
-            ratio_data = calculate_ratio(df1, df2, config['name1'], config['name2'])
+            ratio_data = calculate_ratio(df1, df2, config.name1, config.name2,
+                                         pd.Timedelta(tf.pandas_freq))
             print(f"✅ 计算完成，共 {len(ratio_data)} 个数据点")
             
-            # 显示统计信息
-            current = ratio_data['ratio'].iloc[-1]
-            mean = ratio_data['ratio'].mean()
-            std = ratio_data['ratio'].std()
-            percentile = (ratio_data['ratio'] < current).sum() / len(ratio_data) * 100
+            # 显示统计信息（只计算一次，绘图时复用）
+            stats = calculate_stats(ratio_data)
+            current = stats.current
+            mean = stats.mean
+            std = stats.std
+            percentile = stats.pct
             
             print(f"\n📈 {ratio_key}统计:")
             print(f"   当前值: {current:.2f}")
             print(f"   平均值: {mean:.2f}")
             print(f"   标准差: {std:.2f}")
-            print(f"   最高值: {ratio_data['ratio'].max():.2f} ({ratio_data.loc[ratio_data['ratio'].idxmax(), 'time'].strftime('%Y-%m-%d')})")
-            print(f"   最低值: {ratio_data['ratio'].min():.2f} ({ratio_data.loc[ratio_data['ratio'].idxmin(), 'time'].strftime('%Y-%m-%d')})")
+            print(f"   最高值: {stats.mx:.2f} ({stats.mx_time.strftime('%Y-%m-%d')})")
+            print(f"   最低值: {stats.mn:.2f} ({stats.mn_time.strftime('%Y-%m-%d')})")
             print(f"   当前分位数: {percentile:.1f}%")
             
             # 判断当前位置
             if current > mean + std:
-                print(f"   ⚠️  当前值偏高，{config['name1']}相对强势")
+                print(f"   ⚠️  当前值偏高，{config.name1}相对强势")
             elif current < mean - std:
-                print(f"   ⚠️  当前值偏低，{config['name2']}相对强势")
+                print(f"   ⚠️  当前值偏低，{config.name2}相对强势")
             else:
                 print(f"   ✅ 当前值在正常范围内")
             
             # 绘制图表
             print("\n🎨 正在生成图表...")
             fig = plot_ratio_chart(ratio_data, ratio_key, 
-                                  config['name1'], config['name2'], 
-                                  config['description'])
+                                  config.name1, config.name2, 
+                                  config.description, stats=stats)
             
             # 保存文件
             safe_name = ratio_key.replace("/", "_")
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             
             filename = f"{safe_name}_{timestamp}.png"
-            plt.savefig(filename, dpi=300, bbox_inches='tight')
+            fig.savefig(filename, dpi=CHART_DPI, bbox_inches='tight', pil_kwargs={'optimize': True})
             print(f"✅ 图表已保存: {filename}")
             
-            csv_filename = f"{safe_name}_data_{timestamp}.csv"
-            ratio_data.to_csv(csv_filename, index=False, encoding='utf-8-sig')
-            print(f"✅ 数据已保存: {csv_filename}")
+            data_filename = save_ratio_data(ratio_data, f"{safe_name}_data_{timestamp}", export_format)
+            print(f"✅ 数据已保存: {data_filename}")
             
             # 显示图表
-            print("\n📊 正在显示图表...")
-            plt.show()
+            if not _no_gui():
+                print("\n📊 正在显示图表...")
+                _configure_mpl().show()
         
         print("\n✅ 分析完成！")
         
@@ -266,7 +389,7 @@ def main():
     """主函数"""
     print("\n可用的比值分析:")
     for i, (key, config) in enumerate(RATIO_PRESETS.items(), 1):
-        print(f"{i}. {key}: {config['symbol1']}/{config['symbol2']} - {config['description']}")
+        print(f"{i}. {key}: {config.symbol1}/{config.symbol2} - {config.description}")
     
     print("\n" + "="*70)
     choice = input("请选择要分析的比值 (输入数字或名称，直接回车默认分析金银比): ").strip()
@@ -292,7 +415,11 @@ def main():
     timeframe_input = input("请输入时间周期(H1/H4/D1等，直接回车默认H4): ").strip().upper()
     timeframe_str = timeframe_input if timeframe_input else "H4"
     
-    analyze_ratio(ratio_key, timeframe_str, days)
+    # 询问导出格式
+    format_input = input("请输入数据导出格式(parquet/csv，直接回车默认parquet): ").strip().lower()
+    export_format = 'csv' if format_input == 'csv' else 'parquet'
+    
+    analyze_ratio(ratio_key, timeframe_str, days, export_format)
 
 if __name__ == "__main__":
     main()
@@ -4,11 +4,18 @@ Reusable MetaTrader5 client utilities.
 Public API (lazy-imported):
 - MT5Client: a context-managed client wrapper for MT5 initialization/login and data fetching
 - timeframe_from_str: map timeframe strings like 'M1','M5','H1','D1','W1','MN1' to MT5 constants
+- timeframe_info / Timeframe: MT5 constant, pandas frequency and bar length in seconds for a timeframe string
 """
 
 from typing import Any
 
-__all__ = ["MT5Client", "timeframe_from_str", "AVAILABLE_TIMEFRAMES"]
+__all__ = [
+    "MT5Client",
+    "timeframe_from_str",
+    "timeframe_info",
+    "Timeframe",
+    "AVAILABLE_TIMEFRAMES",
+]
 
 
 def __getattr__(name: str) -> Any:
@@ -16,7 +23,7 @@ def __getattr__(name: str) -> Any:
     if name == "MT5Client":
         from .client import MT5Client  # type: ignore
         return MT5Client
-    if name in ("timeframe_from_str", "AVAILABLE_TIMEFRAMES"):
-        from .periods import timeframe_from_str, AVAILABLE_TIMEFRAMES  # type: ignore
-        return timeframe_from_str if name == "timeframe_from_str" else AVAILABLE_TIMEFRAMES
+    if name in ("timeframe_from_str", "timeframe_info", "Timeframe", "AVAILABLE_TIMEFRAMES"):
+        from . import periods  # type: ignore
+        return getattr(periods, name)
     raise AttributeError(name)
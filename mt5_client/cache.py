@@ -0,0 +1,117 @@
+"""
+Local Parquet cache for MT5 historical bars.
+
+Closed bars never change, so previously fetched bars are kept on disk per
+(server, symbol, timeframe) and callers only need to request the delta since the last
+cached bar. Files live in ~/.mt5_cache/{server}/{symbol}_{timeframe}.parquet, next to a
+{symbol}_{timeframe}.start file holding the earliest start time ever requested, so a
+window that begins before the first bar (weekend, holiday, short history) is not
+re-fetched on every run. Bars are kept per trade server because brokers differ in
+symbols and server-time offset; an empty server name disables the cache.
+
+The cache is best-effort: if it cannot be read or written (e.g. no Parquet
+engine such as pyarrow is installed) callers simply fall back to full fetches.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import re
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+CACHE_DIR = Path.home() / ".mt5_cache"
+
+# Index dtype of cached bars; read_parquet may hand back [ms]/[us] units depending on the
+# pandas/pyarrow versions, which merge_asof refuses to join with freshly fetched bars
+_INDEX_DTYPE = "datetime64[ns, UTC]"
+
+# Characters kept as-is when a server name becomes a directory name
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9._-]")
+
+# (server, symbol, timeframe) -> (close time of the last bar at the last refresh, bars, covered_from)
+_recent: Dict[Tuple[str, str, int], Tuple[pd.Timestamp, pd.DataFrame, pd.Timestamp]] = {}
+
+
+def _cache_path(server: str, symbol: str, timeframe: int) -> Path:
+    return CACHE_DIR / _UNSAFE_CHARS.sub("_", server) / f"{symbol}_{timeframe}.parquet"
+
+
+def _start_path(server: str, symbol: str, timeframe: int) -> Path:
+    return _cache_path(server, symbol, timeframe).with_suffix(".start")
+
+
+def load_cached(server: str, symbol: str, timeframe: int) -> Optional[Tuple[pd.DataFrame, pd.Timestamp]]:
+    """Return (cached bars indexed by UTC 'time', covered_from), or None if there is no usable cache.
+
+    covered_from is the earliest start time already requested from the terminal; there
+    are no bars between it and the first cached bar. Caches written without a .start
+    file fall back to the first cached bar.
+    """
+    if not server:
+        return None
+    path = _cache_path(server, symbol, timeframe)
+    if not path.exists():
+        return None
+    try:
+        df = pd.read_parquet(path)
+    except Exception:
+        return None
+    if not len(df):
+        return None
+    if df.index.dtype != _INDEX_DTYPE:
+        df.index = df.index.astype(_INDEX_DTYPE)
+    try:
+        covered_from = min(pd.Timestamp(_start_path(server, symbol, timeframe).read_text().strip()), df.index[0])
+    except (OSError, ValueError, TypeError):
+        covered_from = df.index[0]
+    return df, covered_from
+
+
+def save_cached(server: str, symbol: str, timeframe: int, df: pd.DataFrame, covered_from: pd.Timestamp) -> None:
+    """Persist bars for (symbol, timeframe) and the earliest start time requested for them.
+
+    The Parquet file is replaced atomically. It is written before the .start file, so
+    an interrupted save can only leave a later covered_from than the bars support,
+    which costs one extra head fetch, never a missing range.
+    """
+    if not server:
+        return
+    path = _cache_path(server, symbol, timeframe)
+    tmp = path.with_suffix(".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(tmp, compression="snappy")
+        os.replace(tmp, path)
+        _start_path(server, symbol, timeframe).write_text(pd.Timestamp(covered_from).isoformat())
+    except Exception:
+        # Caching is an optimization only; never fail the caller because of it
+        with contextlib.suppress(OSError):
+            tmp.unlink()
+
+
+def mark_checked(server: str, symbol: str, timeframe: int, df: pd.DataFrame,
+                 covered_from: pd.Timestamp, bar: pd.Timedelta) -> None:
+    """Record that (symbol, timeframe) was just refreshed from the terminal, keeping its bars in memory.
+
+    The entry expires when the last bar (opened at df.index[-1], bar long) closes.
+    """
+    if server and len(df):
+        _recent[(server, symbol, timeframe)] = (df.index[-1] + bar, df, covered_from)
+
+
+def recently_checked(server: str, symbol: str, timeframe: int) -> Optional[Tuple[pd.DataFrame, pd.Timestamp]]:
+    """(bars, covered_from) of (server, symbol, timeframe) refreshed in this process before the current
+    bar boundary, else None.
+
+    Lets a repeated request skip re-reading the Parquet file. Until the next bar boundary
+    no new bar can open, but the last bar may still be forming, so callers must still
+    refresh it from the terminal rather than use its close as-is.
+    """
+    entry = _recent.get((server, symbol, timeframe))
+    if entry is None or pd.Timestamp.now(tz="UTC") >= entry[0]:
+        return None
+    return entry[1], entry[2]
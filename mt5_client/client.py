@@ -1,11 +1,18 @@
 from __future__ import annotations
 
-import contextlib
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Iterable, List, Optional
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, Tuple
 
-import pandas as pd
+import numpy as np
+
+if TYPE_CHECKING:  # pandas is imported lazily by the data methods; trading-only use never loads it
+    import pandas as pd
 
 try:
     import MetaTrader5 as mt5
@@ -13,6 +20,73 @@ except Exception as e:  # pragma: no cover
     mt5 = None  # type: ignore
 
 
+# OHLCV fields returned by get_rates, in column order. get_rates builds its frame from
+# these fields in this order, so no column selection (and no copy) is needed afterwards.
+_RATE_COLUMNS = ("open", "high", "low", "close", "tick_volume", "spread", "real_volume")
+
+# MT5 trade constants, resolved once at import into one namespace instead of per order
+# (the fallbacks keep the module importable where MetaTrader5 is unavailable)
+_MT5C = SimpleNamespace(
+    ORDER_FILLING_FOK=getattr(mt5, "ORDER_FILLING_FOK", 1),
+    ORDER_FILLING_IOC=getattr(mt5, "ORDER_FILLING_IOC", 2),
+    ORDER_FILLING_RETURN=getattr(mt5, "ORDER_FILLING_RETURN", 4),
+    TRADE_ACTION_DEAL=getattr(mt5, "TRADE_ACTION_DEAL", 1),
+    TRADE_ACTION_SLTP=getattr(mt5, "TRADE_ACTION_SLTP", 6),
+    ORDER_TYPE_BUY=getattr(mt5, "ORDER_TYPE_BUY", 0),
+    ORDER_TYPE_SELL=getattr(mt5, "ORDER_TYPE_SELL", 1),
+    POSITION_TYPE_BUY=getattr(mt5, "POSITION_TYPE_BUY", 0),
+    ORDER_TIME_GTC=getattr(mt5, "ORDER_TIME_GTC", 0),
+    # order_send retcodes treated as success
+    RETCODES=frozenset((
+        getattr(mt5, "TRADE_RETCODE_DONE", 10009),
+        getattr(mt5, "TRADE_RETCODE_DONE_PARTIAL", 10008),
+        getattr(mt5, "TRADE_RETCODE_PLACED", 10016),
+    )),
+)
+
+def _select_filling_mode(symbol_info: Any) -> int:
+    """Pick the order filling type from a symbol's filling_mode flags."""
+    # 根据品种支持的filling_mode选择合适的模式
+    filling_mode = symbol_info.filling_mode
+    
+    # 优先级: IOC > FOK > Return
+    if filling_mode & 2:  # 支持IOC
+        return _MT5C.ORDER_FILLING_IOC
+    if filling_mode & 1:  # 支持FOK
+        return _MT5C.ORDER_FILLING_FOK
+    if filling_mode & 4:  # 支持Return
+        return _MT5C.ORDER_FILLING_RETURN
+    # 默认尝试FOK
+    return _MT5C.ORDER_FILLING_FOK
+
+
+# Seconds a symbol_info() result is reused before asking the terminal again
+_SYMBOL_INFO_TTL = 5.0
+
+_RATE_DTYPES = {"tick_volume": "uint64", "spread": "int32", "real_volume": "uint64"}
+_EMPTY_RATES_DF: Optional["pd.DataFrame"] = None
+
+
+def _empty_rates_df() -> "pd.DataFrame":
+    """Frame returned by get_rates when MT5 has no bars in the requested window.
+
+    Same schema as a non-empty result; built on first use. Callers get a shallow copy
+    and must not mutate it in place.
+    """
+    global _EMPTY_RATES_DF
+    if _EMPTY_RATES_DF is None:
+        import pandas as pd
+        _EMPTY_RATES_DF = pd.DataFrame(
+            {name: np.empty(0, dtype=_RATE_DTYPES.get(name, "float64")) for name in _RATE_COLUMNS},
+            index=pd.DatetimeIndex([], dtype="datetime64[ns, UTC]", name="time"),
+        )
+    return _EMPTY_RATES_DF.copy(deep=False)
+
+# Upper bound on concurrent terminal requests issued by one client; the scripts size
+# their own fetch thread pools with it as well
+MAX_FETCH_WORKERS = 8
+
+
 @dataclass
 class MT5Credentials:
     login: Optional[int] = None
@@ -30,11 +104,30 @@ class MT5Client:
             df = cli.get_rates("XAUUSD.c", timeframe=mt5.TIMEFRAME_M5, count=500)
     """
 
+    # The MetaTrader5 module holds one terminal connection per process; count the clients
+    # using it so one client's shutdown() does not disconnect the others
+    _active_clients = 0
+    _active_lock = threading.Lock()
+
     def __init__(self, creds: Optional[MT5Credentials] = None, *, ensure_initialized: bool = True):
         if mt5 is None:
             raise RuntimeError("MetaTrader5 package not available. Please install MetaTrader5 and run inside Windows with MT5 terminal.")
         self.creds = creds or MT5Credentials()
         self._initialized = False
+        # Serializes symbol lookup/selection when get_rates is called from worker threads
+        self._symbol_lock = threading.Lock()
+        # symbol -> (time.monotonic() of lookup, symbol_info struct); guarded by _symbol_lock
+        self._sym_cache: Dict[str, Tuple[float, Any]] = {}
+        # symbol -> order type_filling derived from symbol_info.filling_mode
+        self._filling_cache: Dict[str, int] = {}
+        # symbol -> (volume_min, volume_max, volume_step) for normalize_volume
+        self._vol_params: Dict[str, Tuple[float, float, float]] = {}
+        # (symbol, side, deviation, magic) -> send_market_order request skeleton
+        self._order_skel: Dict[Tuple[str, str, int, int], dict] = {}
+        # Symbols already confirmed present and selected in Market Watch
+        self._visible_symbols: Set[str] = set()
+        # Created on first concurrent fetch, shut down with the client
+        self._pool: Optional[ThreadPoolExecutor] = None
         if ensure_initialized:
             self.initialize()
 
@@ -55,29 +148,91 @@ class MT5Client:
                     f"MT5 login() failed: {mt5.last_error()}. "
                     "Ensure your login/server/password are correct and the account is available in the terminal."
                 )
+        with MT5Client._active_lock:
+            MT5Client._active_clients += 1
         self._initialized = True
 
     def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        self._visible_symbols.clear()
         if self._initialized:
-            mt5.shutdown()
             self._initialized = False
+            with MT5Client._active_lock:
+                MT5Client._active_clients -= 1
+                last = MT5Client._active_clients == 0
+            if last:
+                mt5.shutdown()
 
     def __enter__(self) -> "MT5Client":
         self.initialize()
         return self
 
     def __exit__(self, exc_type, exc, tb) -> None:
-        with contextlib.suppress(Exception):
+        try:
             self.shutdown()
+        except Exception:
+            pass
 
     # --- Data operations ---
+    def _symbol_info_cached(self, symbol: str, ttl: float = _SYMBOL_INFO_TTL) -> Any:
+        """Return mt5.symbol_info(symbol), reusing a lookup younger than `ttl` seconds.
+
+        Returns None (and caches nothing) if the symbol is unknown.
+        """
+        with self._symbol_lock:
+            entry = self._sym_cache.get(symbol)
+            now = time.monotonic()
+            if entry is not None and now - entry[0] < ttl:
+                return entry[1]
+            info = mt5.symbol_info(symbol)
+            if info is None:
+                self._sym_cache.pop(symbol, None)
+            else:
+                self._sym_cache[symbol] = (now, info)
+            return info
+
+    def _invalidate_symbol(self, symbol: str) -> None:
+        """Drop cached symbol data so the next call asks the terminal again."""
+        with self._symbol_lock:
+            self._sym_cache.pop(symbol, None)
+            self._filling_cache.pop(symbol, None)
+            self._visible_symbols.discard(symbol)
+            self._vol_params.pop(symbol, None)
+            for key in [k for k in self._order_skel if k[0] == symbol]:
+                del self._order_skel[key]
+
     def ensure_symbol(self, symbol: str) -> None:
-        info = mt5.symbol_info(symbol)
+        # Once a symbol is known to be selected, skip the terminal round-trip entirely
+        if symbol in self._visible_symbols:
+            return
+        info = self._symbol_info_cached(symbol)
         if info is None:
             raise ValueError(f"Symbol not found: {symbol}")
         if not info.visible:
-            if not mt5.symbol_select(symbol, True):
+            with self._symbol_lock:
+                ok = mt5.symbol_select(symbol, True)
+                # The cached struct still says "not visible"; refresh on next use
+                self._sym_cache.pop(symbol, None)
+            if not ok:
                 raise RuntimeError(f"Failed to select symbol: {symbol}")
+        self._visible_symbols.add(symbol)
+
+    def _type_filling(self, symbol: str) -> int:
+        """Order filling type for a symbol, derived once from symbol_info.filling_mode."""
+        type_filling = self._filling_cache.get(symbol)
+        if type_filling is not None:
+            return type_filling
+        
+        # 获取品种信息，确定支持的filling mode
+        symbol_info = self._symbol_info_cached(symbol)
+        if symbol_info is None:
+            raise RuntimeError(f"Cannot get symbol info for {symbol}")
+        
+        type_filling = _select_filling_mode(symbol_info)
+        self._filling_cache[symbol] = type_filling
+        return type_filling
 
     def get_rates(
         self,
@@ -95,6 +250,18 @@ class MT5Client:
         Otherwise, uses copy_rates_from_pos with the specified count (default 1000).
         """
         self.ensure_symbol(symbol)
+        return self._fetch_rates(symbol, timeframe, count, from_time_utc, to_time_utc)
+
+    def _fetch_rates(
+        self,
+        symbol: str,
+        timeframe: int,
+        count: Optional[int],
+        from_time_utc: Optional[datetime],
+        to_time_utc: Optional[datetime],
+    ) -> pd.DataFrame:
+        """get_rates without the symbol check; the caller must have called ensure_symbol."""
+        import pandas as pd
         if from_time_utc and to_time_utc:
             rates = mt5.copy_rates_range(symbol, timeframe, from_time_utc, to_time_utc)
         else:
@@ -104,12 +271,25 @@ class MT5Client:
         if rates is None:
             raise RuntimeError(f"Failed to fetch rates for {symbol}, timeframe {timeframe}: {mt5.last_error()}")
         if len(rates) == 0:
-            return pd.DataFrame(columns=["time","open","high","low","close","tick_volume","spread","real_volume"]).set_index(pd.DatetimeIndex([], name="time"))
-        df = pd.DataFrame(rates)
-        # Convert 'time' (unix seconds) to UTC datetime
-        df["time"] = pd.to_datetime(df["time"], unit="s", utc=True)
-        df.set_index("time", inplace=True)
-        return df[["open","high","low","close","tick_volume","spread","real_volume"]].sort_index()
+            return _empty_rates_df()
+        # Build columns straight from the structured array's fields instead of
+        # pd.DataFrame(rates) + column selection + sort_index, each of which copies.
+        # The columns may alias the array returned by MT5, which stays alive as
+        # long as the DataFrame does.
+        times = rates["time"]
+        # MT5 times are int64 epoch seconds: reinterpret them as datetime64[s] and widen to
+        # [ns] in one cast instead of going through pd.to_datetime's unit conversion. The
+        # index is always [ns] (as in the local bar cache) so that frames from different
+        # sources can be joined with merge_asof.
+        index = pd.DatetimeIndex(
+            times.astype("int64", copy=False).view("datetime64[s]").astype("datetime64[ns]"),
+            tz="UTC", name="time",
+        )
+        df = pd.DataFrame({name: rates[name] for name in _RATE_COLUMNS}, index=index, copy=False)
+        # MT5 returns bars in time order; only sort if that ever does not hold
+        if not np.all(times[1:] >= times[:-1]):
+            df = df.sort_index()
+        return df
 
     def get_multi_timeframes(
         self,
@@ -120,7 +300,55 @@ class MT5Client:
         from_time_utc: Optional[datetime] = None,
         to_time_utc: Optional[datetime] = None,
     ) -> List[pd.DataFrame]:
-        return [self.get_rates(symbol, tf, count=count, from_time_utc=from_time_utc, to_time_utc=to_time_utc) for tf in timeframes]
+        """Fetch several timeframes for one symbol; results are in the order of `timeframes`.
+
+        The requests are issued concurrently so total latency is close to the slowest
+        single fetch rather than the sum of all of them.
+        """
+        timeframes = list(timeframes)
+        self.ensure_symbol(symbol)
+        if len(timeframes) <= 1:
+            return [self._fetch_rates(symbol, tf, count, from_time_utc, to_time_utc) for tf in timeframes]
+        pool = self._get_pool()
+        futures = [
+            pool.submit(self._fetch_rates, symbol, tf, count, from_time_utc, to_time_utc)
+            for tf in timeframes
+        ]
+        return [f.result() for f in futures]
+
+    def get_rates_matrix(
+        self,
+        symbols: Iterable[str],
+        timeframes: Iterable[int],
+        *,
+        count: Optional[int] = 1000,
+        from_time_utc: Optional[datetime] = None,
+        to_time_utc: Optional[datetime] = None,
+    ) -> Dict[Tuple[str, int], pd.DataFrame]:
+        """Fetch every (symbol, timeframe) pair concurrently.
+
+        Returns a dict keyed by (symbol, timeframe). Symbols are checked once up front;
+        the first failed fetch is re-raised.
+        """
+        symbols = list(symbols)
+        timeframes = list(timeframes)
+        for symbol in symbols:
+            self.ensure_symbol(symbol)
+        pool = self._get_pool()
+        futures = {
+            pool.submit(self._fetch_rates, symbol, tf, count, from_time_utc, to_time_utc): (symbol, tf)
+            for symbol in symbols
+            for tf in timeframes
+        }
+        result: Dict[Tuple[str, int], pd.DataFrame] = {}
+        for f in as_completed(futures):
+            result[futures[f]] = f.result()
+        return result
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS, thread_name_prefix="mt5-fetch")
+        return self._pool
 
     # --- Convenience price getters ---
     def get_tick(self, symbol: str) -> pd.Series:
@@ -128,16 +356,18 @@ class MT5Client:
 
         Returns a pandas Series with index ['time','bid','ask','last','volume'].
         """
+        import pandas as pd
         self.ensure_symbol(symbol)
         tick = mt5.symbol_info_tick(symbol)
         if tick is None:
             raise RuntimeError(f"Failed to fetch tick for {symbol}: {mt5.last_error()}")
         # tick.time is seconds since epoch; tick.time_msc may exist as ms
         ts = getattr(tick, "time_msc", None)
+        # pd.Timestamp on a scalar avoids pd.to_datetime's array-path dtype inference
         if ts is not None and ts > 0:
-            time_utc = pd.to_datetime(ts, unit="ms", utc=True)
+            time_utc = pd.Timestamp(int(ts), unit="ms", tz="UTC")
         else:
-            time_utc = pd.to_datetime(tick.time, unit="s", utc=True)
+            time_utc = pd.Timestamp(int(tick.time), unit="s", tz="UTC")
         data = {
             "time": time_utc,
             "bid": getattr(tick, "bid", float("nan")),
@@ -165,23 +395,25 @@ class MT5Client:
         Returns a pandas Series with the OHLCV fields indexed by their names and with
         an attribute 'time' for the bar time in UTC.
         """
+        import pandas as pd
         self.ensure_symbol(symbol)
         rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, 1)
         if rates is None or len(rates) == 0:
             raise RuntimeError(f"Failed to fetch latest bar for {symbol}, timeframe {timeframe}: {mt5.last_error()}")
-        df = pd.DataFrame(rates)
-        df["time"] = pd.to_datetime(df["time"], unit="s", utc=True)
-        row = df.iloc[0]
+        # Read the single record directly; no intermediate DataFrame is needed
+        r = rates[0]
+        names = rates.dtype.names
+        nan = float("nan")
         # Return a Series with time and OHLCV fields
         return pd.Series({
-            "time": row["time"],
-            "open": float(row["open"]),
-            "high": float(row["high"]),
-            "low": float(row["low"]),
-            "close": float(row["close"]),
-            "tick_volume": float(row.get("tick_volume", float("nan"))),
-            "spread": float(row.get("spread", float("nan"))),
-            "real_volume": float(row.get("real_volume", float("nan"))),
+            "time": pd.Timestamp(int(r["time"]), unit="s", tz="UTC"),
+            "open": float(r["open"]),
+            "high": float(r["high"]),
+            "low": float(r["low"]),
+            "close": float(r["close"]),
+            "tick_volume": float(r["tick_volume"]) if "tick_volume" in names else nan,
+            "spread": float(r["spread"]) if "spread" in names else nan,
+            "real_volume": float(r["real_volume"]) if "real_volume" in names else nan,
         })
 
     # --- Account and trading operations ---
@@ -209,11 +441,10 @@ class MT5Client:
             return []
         result: List[dict] = []
         for p in positions:
-            p_dict = p._asdict() if hasattr(p, "_asdict") else dict(p.__dict__)
-            # Filter by magic number if specified
-            if magic is not None and p_dict.get("magic") != magic:
+            # Filter by magic number if specified; read the attribute so only kept rows become dicts
+            if magic is not None and getattr(p, "magic", None) != magic:
                 continue
-            result.append(p_dict)
+            result.append(p._asdict() if hasattr(p, "_asdict") else dict(p.__dict__))
         return result
 
     def send_market_order(
@@ -239,38 +470,25 @@ class MT5Client:
         if t not in ("buy", "sell"):
             raise ValueError("order_type must be 'buy' or 'sell'")
         
-        # 获取品种信息，确定支持的filling mode
-        symbol_info = mt5.symbol_info(symbol)
-        if symbol_info is None:
-            raise RuntimeError(f"Cannot get symbol info for {symbol}")
-        
-        # 根据品种支持的filling_mode选择合适的模式
-        filling_mode = symbol_info.filling_mode
-        
-        # 优先级: IOC > FOK > Return
-        if filling_mode & 2:  # 支持IOC
-            type_filling = getattr(mt5, "ORDER_FILLING_IOC", 2)
-        elif filling_mode & 1:  # 支持FOK
-            type_filling = getattr(mt5, "ORDER_FILLING_FOK", 1)
-        elif filling_mode & 4:  # 支持Return
-            type_filling = getattr(mt5, "ORDER_FILLING_RETURN", 4)
-        else:
-            # 默认尝试FOK
-            type_filling = getattr(mt5, "ORDER_FILLING_FOK", 0)
-        
-        action_type = getattr(mt5, "TRADE_ACTION_DEAL", 1)
-        order_type_const = getattr(mt5, "ORDER_TYPE_BUY", 0) if t == "buy" else getattr(mt5, "ORDER_TYPE_SELL", 1)
-        request = {
-            "action": action_type,
-            "symbol": symbol,
-            "volume": float(volume),
-            "type": order_type_const,
-            "deviation": int(deviation),
-            "comment": comment,
-            "magic": int(magic),
-            "type_filling": type_filling,
-            "type_time": getattr(mt5, "ORDER_TIME_GTC", 0),
-        }
+        # Fields that only depend on (symbol, side, deviation, magic) are built once and reused
+        key = (symbol, t, int(deviation), int(magic))
+        skel = self._order_skel.get(key)
+        if skel is None:
+            skel = {
+                "action": _MT5C.TRADE_ACTION_DEAL,
+                "symbol": symbol,
+                "volume": 0.0,
+                "type": _MT5C.ORDER_TYPE_BUY if t == "buy" else _MT5C.ORDER_TYPE_SELL,
+                "deviation": key[2],
+                "comment": "",
+                "magic": key[3],
+                "type_filling": self._type_filling(symbol),
+                "type_time": _MT5C.ORDER_TIME_GTC,
+            }
+            self._order_skel[key] = skel
+        request = skel.copy()
+        request["volume"] = float(volume)
+        request["comment"] = comment
         if sl is not None:
             request["sl"] = float(sl)
         if tp is not None:
@@ -281,11 +499,8 @@ class MT5Client:
         res = result._asdict() if hasattr(result, "_asdict") else dict(result.__dict__)
         # status 10009/10008 are accepted; check retcode
         retcode = res.get("retcode")
-        if retcode not in (
-            getattr(mt5, "TRADE_RETCODE_DONE", 10009),
-            getattr(mt5, "TRADE_RETCODE_DONE_PARTIAL", 10008),
-            getattr(mt5, "TRADE_RETCODE_PLACED", 10016),
-        ):
+        if retcode not in _MT5C.RETCODES:
+            self._invalidate_symbol(symbol)
             raise RuntimeError(f"Order failed: retcode={retcode}, details={res}")
         return res
 
@@ -296,36 +511,24 @@ class MT5Client:
             raise RuntimeError(f"Position not found for ticket {ticket}: {mt5.last_error()}")
         p = pos_list[0]
         p_dict = p._asdict() if hasattr(p, "_asdict") else dict(p.__dict__)
+        p_dict["ticket"] = ticket
+        return self._close_position_from_dict(p_dict, deviation=deviation, comment=comment)
+
+    def _close_position_from_dict(self, p_dict: dict, *, deviation: int = 20, comment: str = "") -> dict:
+        """Close an already-fetched position record (as returned by positions_get, converted to dict)."""
+        ticket = p_dict.get("ticket")
         symbol = p_dict.get("symbol")
         volume = float(p_dict.get("volume", 0.0))
         order_type = p_dict.get("type")
         if order_type is None:
             raise RuntimeError("Position type not available")
         # Determine opposite order type
-        type_buy = getattr(mt5, "POSITION_TYPE_BUY", 0)
-        opposite_const = getattr(mt5, "ORDER_TYPE_SELL", 1) if order_type == type_buy else getattr(mt5, "ORDER_TYPE_BUY", 0)
-        
-        # 获取品种信息，确定支持的filling mode
-        symbol_info = mt5.symbol_info(symbol)
-        if symbol_info is None:
-            raise RuntimeError(f"Cannot get symbol info for {symbol}")
+        opposite_const = _MT5C.ORDER_TYPE_SELL if order_type == _MT5C.POSITION_TYPE_BUY else _MT5C.ORDER_TYPE_BUY
         
-        # 根据品种支持的filling_mode选择合适的模式
-        filling_mode = symbol_info.filling_mode
-        
-        # 优先级: IOC > FOK > Return
-        if filling_mode & 2:  # 支持IOC
-            type_filling = getattr(mt5, "ORDER_FILLING_IOC", 2)
-        elif filling_mode & 1:  # 支持FOK
-            type_filling = getattr(mt5, "ORDER_FILLING_FOK", 1)
-        elif filling_mode & 4:  # 支持Return
-            type_filling = getattr(mt5, "ORDER_FILLING_RETURN", 4)
-        else:
-            # 默认尝试FOK
-            type_filling = getattr(mt5, "ORDER_FILLING_FOK", 0)
+        type_filling = self._type_filling(symbol)
         
         request = {
-            "action": getattr(mt5, "TRADE_ACTION_DEAL", 1),
+            "action": _MT5C.TRADE_ACTION_DEAL,
             "symbol": symbol,
             "volume": volume,
             "type": opposite_const,
@@ -333,18 +536,15 @@ class MT5Client:
             "deviation": int(deviation),
             "comment": comment or "close_position",
             "type_filling": type_filling,
-            "type_time": getattr(mt5, "ORDER_TIME_GTC", 0),
+            "type_time": _MT5C.ORDER_TIME_GTC,
         }
         result = mt5.order_send(request)
         if result is None:
             raise RuntimeError(f"order_send returned None: {mt5.last_error()}")
         res = result._asdict() if hasattr(result, "_asdict") else dict(result.__dict__)
         retcode = res.get("retcode")
-        if retcode not in (
-            getattr(mt5, "TRADE_RETCODE_DONE", 10009),
-            getattr(mt5, "TRADE_RETCODE_DONE_PARTIAL", 10008),
-            getattr(mt5, "TRADE_RETCODE_PLACED", 10016),
-        ):
+        if retcode not in _MT5C.RETCODES:
+            self._invalidate_symbol(symbol)
             raise RuntimeError(f"Close failed: retcode={retcode}, details={res}")
         return res
 
@@ -355,11 +555,11 @@ class MT5Client:
         for p in positions or []:
             try:
                 # Filter by magic number if specified
-                if magic is not None:
-                    p_dict = p._asdict() if hasattr(p, "_asdict") else dict(p.__dict__)
-                    if p_dict.get("magic") != magic:
-                        continue
-                res = self.close_position(p.ticket, deviation=deviation)
+                if magic is not None and getattr(p, "magic", None) != magic:
+                    continue
+                # Close from the record already in hand instead of re-querying it by ticket
+                p_dict = p._asdict() if hasattr(p, "_asdict") else dict(p.__dict__)
+                res = self._close_position_from_dict(p_dict, deviation=deviation)
                 results.append(res)
             except Exception as e:
                 results.append({"ticket": getattr(p, "ticket", None), "error": str(e)})
@@ -382,7 +582,7 @@ class MT5Client:
         Returns the raw result dict from order_send.
         """
         request = {
-            "action": getattr(mt5, "TRADE_ACTION_SLTP", 6),
+            "action": _MT5C.TRADE_ACTION_SLTP,
             "position": int(ticket),
             "comment": comment,
         }
@@ -397,11 +597,7 @@ class MT5Client:
         res = result._asdict() if hasattr(result, "_asdict") else dict(result.__dict__)
         # Check retcode for success
         retcode = res.get("retcode")
-        if retcode not in (
-            getattr(mt5, "TRADE_RETCODE_DONE", 10009),
-            getattr(mt5, "TRADE_RETCODE_DONE_PARTIAL", 10008),
-            getattr(mt5, "TRADE_RETCODE_PLACED", 10016),
-        ):
+        if retcode not in _MT5C.RETCODES:
             raise RuntimeError(f"Modify SLTP failed: retcode={retcode}, details={res}")
         return res
 
@@ -433,30 +629,12 @@ class MT5Client:
             raise RuntimeError("Position type not available")
         
         # Determine opposite order type
-        type_buy = getattr(mt5, "POSITION_TYPE_BUY", 0)
-        opposite_const = getattr(mt5, "ORDER_TYPE_SELL", 1) if order_type == type_buy else getattr(mt5, "ORDER_TYPE_BUY", 0)
+        opposite_const = _MT5C.ORDER_TYPE_SELL if order_type == _MT5C.POSITION_TYPE_BUY else _MT5C.ORDER_TYPE_BUY
         
-        # 获取品种信息，确定支持的filling mode
-        symbol_info = mt5.symbol_info(symbol)
-        if symbol_info is None:
-            raise RuntimeError(f"Cannot get symbol info for {symbol}")
-        
-        # 根据品种支持的filling_mode选择合适的模式
-        filling_mode = symbol_info.filling_mode
-        
-        # 优先级: IOC > FOK > Return
-        if filling_mode & 2:  # 支持IOC
-            type_filling = getattr(mt5, "ORDER_FILLING_IOC", 2)
-        elif filling_mode & 1:  # 支持FOK
-            type_filling = getattr(mt5, "ORDER_FILLING_FOK", 1)
-        elif filling_mode & 4:  # 支持Return
-            type_filling = getattr(mt5, "ORDER_FILLING_RETURN", 4)
-        else:
-            # 默认尝试FOK
-            type_filling = getattr(mt5, "ORDER_FILLING_FOK", 0)
+        type_filling = self._type_filling(symbol)
         
         request = {
-            "action": getattr(mt5, "TRADE_ACTION_DEAL", 1),
+            "action": _MT5C.TRADE_ACTION_DEAL,
             "symbol": symbol,
             "volume": float(volume),
             "type": opposite_const,
@@ -464,7 +642,7 @@ class MT5Client:
             "deviation": int(deviation),
             "comment": comment or "partial_close",
             "type_filling": type_filling,
-            "type_time": getattr(mt5, "ORDER_TIME_GTC", 0),
+            "type_time": _MT5C.ORDER_TIME_GTC,
         }
         
         result = mt5.order_send(request)
@@ -472,11 +650,8 @@ class MT5Client:
             raise RuntimeError(f"order_send returned None: {mt5.last_error()}")
         res = result._asdict() if hasattr(result, "_asdict") else dict(result.__dict__)
         retcode = res.get("retcode")
-        if retcode not in (
-            getattr(mt5, "TRADE_RETCODE_DONE", 10009),
-            getattr(mt5, "TRADE_RETCODE_DONE_PARTIAL", 10008),
-            getattr(mt5, "TRADE_RETCODE_PLACED", 10016),
-        ):
+        if retcode not in _MT5C.RETCODES:
+            self._invalidate_symbol(symbol)
             raise RuntimeError(f"Partial close failed: retcode={retcode}, details={res}")
         return res
 
@@ -488,16 +663,21 @@ class MT5Client:
         Returns normalized volume
         """
         try:
-            info = mt5.symbol_info(symbol)
-            if info is None:
-                return max(0.01, round(volume, 2))
-            
-            volume_min = float(getattr(info, "volume_min", 0.01))
-            volume_max = float(getattr(info, "volume_max", 100.0))
-            volume_step = float(getattr(info, "volume_step", 0.01))
+            params = self._vol_params.get(symbol)
+            if params is None:
+                info = self._symbol_info_cached(symbol)
+                if info is None:
+                    return max(0.01, round(volume, 2))
+                params = (
+                    float(getattr(info, "volume_min", 0.01)),
+                    float(getattr(info, "volume_max", 100.0)),
+                    float(getattr(info, "volume_step", 0.01)),
+                )
+                self._vol_params[symbol] = params
+            volume_min, volume_max, volume_step = params
             
-            # Round to nearest step
-            normalized = round(volume / volume_step) * volume_step
+            # Round to nearest step (halves round up)
+            normalized = math.floor(volume / volume_step + 0.5) * volume_step
             # Clamp to min/max
             normalized = max(volume_min, min(volume_max, normalized))
             
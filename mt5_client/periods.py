@@ -1,4 +1,7 @@
-from typing import Dict, Iterable, List
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Iterable, List, Mapping, Tuple
 
 try:
     import MetaTrader5 as mt5
@@ -6,9 +9,9 @@ except Exception:  # pragma: no cover - allow import where MT5 is unavailable
     mt5 = None  # type: ignore
 
 
-# Mapping from common timeframe strings to MT5 timeframe constants
+# Mapping from common timeframe strings to MT5 timeframe constants (read-only)
 # Accept both upper and lower case
-_TIMEFRAME_MAP: Dict[str, int] = {
+_TIMEFRAME_MAP: Mapping[str, int] = MappingProxyType({
     "M1": getattr(mt5, "TIMEFRAME_M1", 1),
     "M2": getattr(mt5, "TIMEFRAME_M2", 2),
     "M3": getattr(mt5, "TIMEFRAME_M3", 3),
@@ -30,15 +33,47 @@ _TIMEFRAME_MAP: Dict[str, int] = {
     "D1": getattr(mt5, "TIMEFRAME_D1", 1440),
     "W1": getattr(mt5, "TIMEFRAME_W1", 10080),
     "MN1": getattr(mt5, "TIMEFRAME_MN1", 43200),
-}
+})
 
-# Export a sorted list of available timeframe keys for help messages
-AVAILABLE_TIMEFRAMES: List[str] = sorted(_TIMEFRAME_MAP.keys(), key=lambda x: (
-    0 if x.startswith("M") else 1 if x.startswith("H") else 2 if x.startswith("D") else 3 if x.startswith("W") else 4,
-    int(x[1:].replace("N", "100")) if x[0] in ("M", "H", "D", "W") else 999,
-))
+# Nominal bar length in minutes for each timeframe (MN1 approximated as 30 days)
+_TIMEFRAME_MINUTES: Mapping[str, int] = MappingProxyType({
+    "M1": 1, "M2": 2, "M3": 3, "M4": 4, "M5": 5, "M6": 6, "M10": 10, "M12": 12,
+    "M15": 15, "M20": 20, "M30": 30,
+    "H1": 60, "H2": 120, "H3": 180, "H4": 240, "H6": 360, "H8": 480, "H12": 720,
+    "D1": 1440, "W1": 10080, "MN1": 43200,
+})
 
+# Sort rank of each timeframe unit prefix: minutes, hours, days, weeks, months
+_ORDER = {"M": 0, "H": 1, "D": 2, "W": 3, "MN": 4}
 
+
+def _sort_key(key: str) -> Tuple[int, int]:
+    unit = key.rstrip("0123456789")
+    return _ORDER[unit], int(key[len(unit):])
+
+
+# Sorted available timeframe keys for help messages (computed once at import)
+AVAILABLE_TIMEFRAMES: Tuple[str, ...] = tuple(sorted(_TIMEFRAME_MAP, key=_sort_key))
+
+
+@dataclass(frozen=True)
+class Timeframe:
+    """A timeframe's MT5 constant together with its nominal bar length."""
+
+    mt5_code: int
+    pandas_freq: str  # e.g. '4h', usable with pd.Timedelta / pd.date_range
+    seconds: int
+
+
+def _pandas_freq(minutes: int) -> str:
+    if minutes % 1440 == 0:
+        return f"{minutes // 1440}D"
+    if minutes % 60 == 0:
+        return f"{minutes // 60}h"
+    return f"{minutes}min"
+
+
+@lru_cache(maxsize=None)
 def timeframe_from_str(tf: str) -> int:
     """Map timeframe string like 'M1','H1','D1','W1','MN1' to MT5 constant.
 
@@ -50,6 +85,30 @@ def timeframe_from_str(tf: str) -> int:
     raise ValueError(f"Unsupported timeframe: {tf}. Supported: {', '.join(AVAILABLE_TIMEFRAMES)}")
 
 
+@lru_cache(maxsize=None)
+def timeframe_info(tf: str) -> Timeframe:
+    """Return the MT5 constant, pandas frequency and bar length in seconds for a string like 'H4'.
+
+    Raises ValueError if not supported.
+    """
+    key = tf.strip().upper()
+    if key not in _TIMEFRAME_MINUTES:
+        raise ValueError(f"Unsupported timeframe: {tf}. Supported: {', '.join(AVAILABLE_TIMEFRAMES)}")
+    minutes = _TIMEFRAME_MINUTES[key]
+    return Timeframe(
+        mt5_code=_TIMEFRAME_MAP[key],
+        pandas_freq=_pandas_freq(minutes),
+        seconds=minutes * 60,
+    )
+
+
 def parse_timeframes(items: Iterable[str]) -> List[int]:
-    """Parse an iterable of timeframe strings to MT5 constants."""
-    return [timeframe_from_str(x) for x in items]
+    """Parse an iterable of timeframe strings to MT5 constants.
+
+    Raises ValueError on the first unsupported item.
+    """
+    _map = _TIMEFRAME_MAP
+    try:
+        return [_map[x.strip().upper()] for x in items]
+    except KeyError as e:
+        raise ValueError(f"Unsupported timeframe: {e.args[0]}. Supported: {', '.join(AVAILABLE_TIMEFRAMES)}") from None
@@ -0,0 +1,86 @@
+"""
+Helpers shared by the ratio analysis scripts.
+
+Summary statistics of a ratio series and the chart/data output settings, kept in one
+place so market_ratio_analyzer.py and analyze_all_ratios.py report and save ratios
+the same way.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  # optional: Parquet export of ratio data
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+# Chart resolution: 150 DPI is enough for on-screen viewing and encodes noticeably
+# faster and smaller than 300 DPI
+CHART_DPI = 150
+
+
+@dataclass
+class StatsSummary:
+    """Summary statistics of a ratio series, computed once and shared by printing, plots and tables."""
+
+    mean: float
+    std: float
+    current: float
+    pct: float  # percentile of the current value (%)
+    mx: float
+    mn: float
+    mx_time: pd.Timestamp  # time of the maximum
+    mn_time: pd.Timestamp  # time of the minimum
+    n: int  # number of data points
+    days: int  # time span in days
+    t_start: pd.Timestamp
+    t_end: pd.Timestamp
+
+
+def calculate_stats(ratio_data: pd.DataFrame) -> StatsSummary:
+    """Compute StatsSummary for a frame with 'time' and 'ratio' columns.
+
+    The percentile is the share of values strictly below the current one, from one
+    vectorized comparison (no sort needed). Max/min and their times are taken by
+    position via argmax/argmin instead of pandas label lookups.
+    """
+    r = ratio_data['ratio'].to_numpy()
+    current = float(r[-1])
+    times = ratio_data['time']
+    t_start = times.iloc[0]
+    t_end = times.iloc[-1]
+    i_max = int(r.argmax())
+    i_min = int(r.argmin())
+    return StatsSummary(
+        mean=float(r.mean()),
+        std=float(r.std(ddof=1)),  # sample standard deviation, same as pandas Series.std()
+        current=current,
+        pct=float((r < current).mean()) * 100,
+        mx=float(r[i_max]),
+        mn=float(r[i_min]),
+        mx_time=times.iloc[i_max],
+        mn_time=times.iloc[i_min],
+        n=int(r.size),
+        days=(t_end - t_start).days,
+        t_start=t_start,
+        t_end=t_end,
+    )
+
+
+def save_ratio_data(data: pd.DataFrame, basename: str, export_format: str = 'parquet') -> str:
+    """Write ratio data to {basename}.parquet or {basename}.csv and return the file name.
+
+    Parquet (zstd, columnar) is much faster to write and smaller than row-by-row CSV;
+    CSV is used when export_format='csv' or pyarrow is not installed.
+    """
+    if export_format == 'parquet' and HAS_PARQUET:
+        filename = f"{basename}.parquet"
+        data.to_parquet(filename, compression='zstd', index=False)
+    else:
+        filename = f"{basename}.csv"
+        data.to_csv(filename, index=False, encoding='utf-8-sig')
+    return filename